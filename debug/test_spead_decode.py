@@ -0,0 +1,97 @@
+"""
+Check that the compiled SPEAD item pointer decoder, casperfpga._spead_c,
+gives the same results as the pure-Python fallback in casperfpga.spead,
+and that a SpeadProcessor packet ring doesn't hold on to old captures.
+
+Run directly, or with pytest. The parity check does nothing if _spead_c
+was not built.
+"""
+import random
+
+import numpy as np
+
+from casperfpga import spead
+
+# header IDs to pick from, with and without the immediate-addressing bit -
+# small enough that repeats, padding (0x0000) and 0x0004 all turn up
+HEADER_IDS = [0x0000, 0x8000, 0x0001, 0x8001, 0x0003, 0x8003, 0x0004, 0x8004,
+              0x0005, 0x8005]
+
+
+def random_header_words(rng, max_headers=10):
+    words = []
+    for _ in range(rng.randint(0, max_headers)):
+        if rng.random() < 0.8:
+            words.append((rng.choice(HEADER_IDS) << 48) | rng.getrandbits(48))
+        else:
+            words.append(rng.getrandbits(64))
+    return words
+
+
+def test_decode_item_pointers_parity(num_blocks=20000, seed=0):
+    if spead._spead_c is None:
+        print('casperfpga._spead_c is not built, nothing to check')
+        return
+    rng = random.Random(seed)
+    for id_bits, address_bits in [(16, 48), (24, 40)]:
+        for _ in range(num_blocks):
+            words = random_header_words(rng)
+            c_result = spead._spead_c.decode_item_pointers(
+                np.array(words, dtype=np.uint64), id_bits, address_bits)
+            py_result = spead.SpeadPacket._decode_item_pointers_py(
+                words, id_bits, address_bits)
+            assert c_result == py_result, (words, c_result, py_result)
+
+
+def test_duplicate_header_is_first_repeat():
+    words = [(hdr_id << 48) | 1 for hdr_id in (5, 3, 5, 3)]
+    py_result = spead.SpeadPacket._decode_item_pointers_py(words, 16, 48)
+    assert py_result[2] == 5, py_result
+    if spead._spead_c is not None:
+        c_result = spead._spead_c.decode_item_pointers(
+            np.array(words, dtype=np.uint64), 16, 48)
+        assert c_result[2] == 5, c_result
+
+
+def make_capture(num_packets, num_words=8):
+    """
+    Make a snap-style capture of SPEAD 4, '64,48' packets and its EOF mask.
+    """
+    words = []
+    eofs = []
+    for pkt_ctr in range(num_packets):
+        words.append((83 << 56) | (4 << 48) | (2 << 40) | (6 << 32) | 2)
+        words.append((0x8001 << 48) | pkt_ctr)
+        words.append((0x8004 << 48) | (num_words * 8))
+        words.extend(range(1, num_words + 1))
+        eofs.extend([False] * (num_words + 2) + [True])
+    return np.array(words, dtype=np.uint64), np.array(eofs, dtype=bool)
+
+
+def test_ring_does_not_pin_capture_buffers():
+    for numpy_data in [False, True]:
+        processor = spead.SpeadProcessor(4, '64,48', ring_size=1,
+                                         numpy_data=numpy_data)
+        first_words, first_eofs = make_capture(1)
+        processor.process_buffer(first_words, first_eofs)
+        recycled = processor.packets[0]
+        second_words, second_eofs = make_capture(1)
+        processor.process_buffer(second_words, second_eofs)
+        assert processor.packets[0] is recycled
+        if numpy_data:
+            assert not np.shares_memory(recycled.data, first_words)
+            assert not np.shares_memory(recycled.data, second_words)
+        else:
+            assert isinstance(recycled.data, list)
+        first_words[:] = 0
+        second_words[:] = 0
+        assert list(recycled.data) == list(range(1, 9)), recycled.data
+
+
+if __name__ == '__main__':
+    test_decode_item_pointers_parity()
+    test_duplicate_header_is_first_repeat()
+    test_ring_does_not_pin_capture_buffers()
+    print('OK')
+
+# end
@@ -3,6 +3,11 @@ import glob
 import sysconfig
 import os
 
+try:
+    from Cython.Build import cythonize
+except ImportError:
+    cythonize = None
+
 NAME = 'casperfpga'
 DESCRIPTION = 'Talk to CASPER hardware devices using katcp or dcp. See https://github.com/casper-astro/casperfpga for more.'
 URL = 'https://github.com/casper-astro/casperfpga'
@@ -22,6 +27,16 @@ except Exception as exc:
 
 # extra_compile_args = sysconfig.get_config_var('CFLAGS').split()
 extra_compile_args = ['-O2', '-Wall']
+# the C extensions are built with Python's own CFLAGS unless
+# CASPERFPGA_NATIVE is set, which optimises them for the build machine only -
+# don't use it for sdists, wheels or distro packages
+native_compile_args = []
+native_link_args = []
+if os.environ.get('CASPERFPGA_NATIVE'):
+    native_compile_args = ['-O3', '-g0', '-fno-plt', '-flto']
+    native_link_args = ['-flto']
+    if '-march' not in os.environ.get('CFLAGS', ''):
+        native_compile_args.append('-march=native')
 progska_extension = setuptools.Extension(
     'casperfpga.progska',
     # sources=['progska/_progska.c', 'progska/progska.c', 'progska/th.c',
@@ -32,8 +47,22 @@ progska_extension = setuptools.Extension(
     language='c',
     # extra_compile_args=extra_compile_args,
     # extra_link_args=['-static'],
+    extra_compile_args=native_compile_args,
+    extra_link_args=native_link_args,
 )
 
+ext_modules = [progska_extension]
+# optional - the SPEAD decoder falls back to pure Python if this isn't built
+if cythonize is not None:
+    spead_extension = setuptools.Extension(
+        'casperfpga._spead_c',
+        sources=['src/_spead_c.pyx'],
+        language='c',
+        extra_compile_args=native_compile_args,
+        extra_link_args=native_link_args,
+    )
+    ext_modules.extend(cythonize([spead_extension]))
+
 
 setuptools.setup(
     name=NAME,
@@ -49,7 +78,6 @@ setuptools.setup(
     install_requires=[
         'katcp==0.6.2',
         'numpy==1.16',
-        'odict',
         'setuptools',
         'tornado==4.3',
     ],
@@ -58,7 +86,7 @@ setuptools.setup(
     scripts=glob.glob('scripts/*'),
     setup_requires=['katversion'],
     use_katversion=True,
-    ext_modules=[progska_extension],
+    ext_modules=ext_modules,
     # Required for PyPI
     keywords='casper ska meerkat fpga',
     classifiers=[
@@ -0,0 +1,38 @@
+# cython: language_level=3, boundscheck=False, wraparound=False
+"""
+C versions of the inner loops of the SPEAD decoding in spead.py.
+"""
+from libc.stdint cimport uint64_t
+
+
+def decode_item_pointers(const uint64_t[:] words, int id_bits,
+                         int address_bits):
+    """
+    Decode a block of 64-bit SPEAD header words, see
+    spead.SpeadPacket._decode_item_pointers.
+
+    :param words: the header words, a contiguous uint64 buffer
+    :param id_bits: how many bits are used for the ID
+    :param address_bits: how many bits are used for the data/pointer
+    :return: a tuple of the headers dict, the packet length header (-1 if
+        there isn't one) and the first repeated non-zero header ID (-1 if
+        there isn't one)
+    """
+    cdef uint64_t id_mask = ((<uint64_t>1) << (id_bits - 1)) - 1
+    cdef uint64_t addr_mask = ((<uint64_t>1) << address_bits) - 1
+    cdef uint64_t word, hdr_id, hdr_data
+    cdef Py_ssize_t ctr
+    cdef dict headers = {}
+    cdef object pkt_len = -1
+    for ctr in range(words.shape[0]):
+        word = words[ctr]
+        # the top bit of the ID flags immediate addressing, always clear it
+        hdr_id = (word >> address_bits) & id_mask
+        # the padded headers are 0x00, so they may repeat
+        if (hdr_id != 0) and (hdr_id in headers):
+            return headers, pkt_len, hdr_id
+        hdr_data = word & addr_mask
+        headers[hdr_id] = hdr_data
+        if hdr_id == 0x0004:
+            pkt_len = hdr_data
+    return headers, pkt_len, -1
@@ -8,7 +8,7 @@
 * Data structures
 """
 import struct
-from odict import odict
+from collections import OrderedDict
 
 # SKARAB Port Addresses
 ETHERNET_FABRIC_PORT_ADDRESS = 0x7148
@@ -1228,10 +1228,10 @@ class Command(object):
         :param command_id: Integer value
         :param seq_num:  Integer value
         """
-        self.packet = odict({
-            'command_type': command_id,
-            'seq_num': seq_num,
-            })
+        self.packet = OrderedDict([
+            ('command_type', command_id),
+            ('seq_num', seq_num),
+            ])
         self.type = self.packet['command_type']
         self.seq_num = self.packet['seq_num']
 
@@ -2,14 +2,149 @@
 SPEAD operations - unpack and use spead data, usually from Snap blocks.
 """
 import logging
+import sys
+from collections import deque, namedtuple
+import numpy as np
+
+try:
+    from sys import intern
+except ImportError:
+    # Python 2, intern is a builtin
+    pass
+
+try:
+    from . import _spead_c
+except ImportError:
+    _spead_c = None
 
 LOGGER = logging.getLogger(__name__)
 
+# flavour strings, built once per distinct (id width, address width) pair and
+# interned, so comparing them to an interned flavour is an identity check
+_FLAVOUR_CACHE = {}
+
+
+def _flavour_cache_get(id_width, addr_width):
+    """
+    Get the flavour string, e.g. '64,48', for the given id and address
+    widths, in bytes.
+    """
+    key = (id_width << 8) | addr_width
+    try:
+        return _FLAVOUR_CACHE[key]
+    except KeyError:
+        return _FLAVOUR_CACHE.setdefault(key, intern('%i,%i' % (
+            (addr_width + id_width) * 8, addr_width * 8)))
+
+
+# item pointer masks, keyed on (id_bits, address_bits)
+_PTR_MASKS_CACHE = {}
+
+
+def _ptr_masks(id_bits, address_bits):
+    """
+    Get the masks needed to decode an item pointer.
+
+    :param id_bits: how many bits are used for the ID
+    :param address_bits: how many bits are used for the data/pointer
+    :return: a tuple of the ID mask, which also clears the
+        immediate-addressing top bit, and the data/pointer mask
+    """
+    try:
+        return _PTR_MASKS_CACHE[(id_bits, address_bits)]
+    except KeyError:
+        masks = ((1 << (id_bits - 1)) - 1, (1 << address_bits) - 1)
+        return _PTR_MASKS_CACHE.setdefault((id_bits, address_bits), masks)
+
+
+def _magic_prefix(version, flavour):
+    """
+    Get the top 48 bits of the magic word expected for a SPEAD version and
+    flavour - the magic number, version, id width, address width and zero
+    reserved field, i.e. everything except the number of headers - so a
+    word can be classified with a single shift and compare.
+
+    :param version: the SPEAD version, an integer
+    :param flavour: the SPEAD flavour as a string, e.g. '64,48'
+    :return: the expected value of (magic word >> 16)
+    """
+    total_bits, addr_bits = [int(b) for b in flavour.split(',')]
+    id_width = (total_bits - addr_bits) // 8
+    addr_width = addr_bits // 8
+    return (83 << 40) | (version << 32) | (id_width << 24) | (addr_width << 16)
+
+
+class SpeadHeader(namedtuple('SpeadHeader', [
+        'magic_number', 'version', 'id_bits', 'address_bits', 'reserved',
+        'num_headers', 'flavour'])):
+    """
+    A decoded SPEAD magic word. For code written against the dict
+    previously used here, fields may also be looked up by name, e.g.
+    header['version'], and 'in', get(), keys() and items() work on the
+    field names. Iterating still gives the values, as for any tuple - use
+    keys(), or _asdict() if a real dict is needed.
+    """
+    __slots__ = ()
+
+    def __getitem__(self, key):
+        if isinstance(key, (int, slice)):
+            return tuple.__getitem__(self, key)
+        if key in self._fields:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def __contains__(self, key):
+        return key in self._fields
+
+    def get(self, key, default=None):
+        if key in self._fields:
+            return getattr(self, key)
+        return default
+
+    def keys(self):
+        return list(self._fields)
+
+    def items(self):
+        return list(zip(self._fields, self))
+
+
+# decoded magic words, keyed on the raw word - every packet in a capture
+# usually has the same one
+_MAGIC_CACHE = {}
+_MAGIC_CACHE_SIZE = 8
+
+
+def _decode_magic_cached(word64):
+    """
+    Split a 64-bit SPEAD magic word into its fields, without checking any
+    of them. See SpeadPacket.decode_spead_magic_word.
+
+    :param word64: a 64-bit word
+    :return: a SpeadHeader
+    """
+    try:
+        return _MAGIC_CACHE[word64]
+    except KeyError:
+        pass
+    spead_id_width = (word64 >> 40) & 0xff
+    spead_addr_width = (word64 >> 32) & 0xff
+    header = SpeadHeader(
+        word64 >> 56, (word64 >> 48) & 0xff, spead_id_width * 8,
+        spead_addr_width * 8, (word64 >> 16) & 0xffff, word64 & 0xffff,
+        _flavour_cache_get(spead_id_width, spead_addr_width))
+    if len(_MAGIC_CACHE) >= _MAGIC_CACHE_SIZE:
+        _MAGIC_CACHE.clear()
+    _MAGIC_CACHE[word64] = header
+    return header
+
 
 class SpeadPacket(object):
     """
     A Spead packet. Headers and data.
     """
+    # SpeadProcessor keeps every packet, so don't give each one a __dict__.
+    # ip is set by SpeadProcessor when the source address is known.
+    __slots__ = ('headers', 'data', 'ip')
 
     class SpeadPacketError(Exception):
         pass
@@ -27,23 +162,23 @@ class SpeadPacket(object):
             a string, e.g. '64,48'
         :param required_numheaders: the number of headers (NOT incl. the 
             magic number) expected, an integer
+        :return: a SpeadHeader
         """
+        # reject non-headers before they are decoded, or cached
         magic_number = word64 >> 56
-        spead_version = (word64 >> 48) & 0xff
-        spead_id_width = (word64 >> 40) & 0xff
-        spead_addr_width = (word64 >> 32) & 0xff
-        reserved = (word64 >> 16) & 0xffff
-        num_headers = word64 & 0xffff
-        spead_flavour = '%s,%s' % (
-            (spead_addr_width * 8) + (spead_id_width * 8), spead_addr_width * 8)
         if magic_number != 83:
             raise SpeadPacket.SpeadPacketError(
                 'Wrong SPEAD magic number, expected {}, got {}'.format(
                     83, magic_number))
+        reserved = (word64 >> 16) & 0xffff
         if reserved != 0:
             raise SpeadPacket.SpeadPacketError(
                 'Wrong SPEAD reserved section, expected {}, got {}'.format(
                     0, reserved))
+        header = _decode_magic_cached(word64)
+        spead_version = header.version
+        num_headers = header.num_headers
+        spead_flavour = header.flavour
         if (required_version is not None) and (
                     spead_version != required_version):
             raise SpeadPacket.SpeadPacketError(
@@ -59,13 +194,7 @@ class SpeadPacket(object):
             raise SpeadPacket.SpeadPacketError(
                 'Wrong num SPEAD hdrs, expected {}, got {}'.format(
                     required_numheaders, num_headers))
-        return {'magic_number': magic_number,
-                'version': spead_version,
-                'id_bits': spead_id_width * 8,
-                'address_bits': spead_addr_width * 8,
-                'reserved': reserved,
-                'num_headers': num_headers,
-                'flavour': spead_flavour}
+        return header
 
     @staticmethod
     def find_spead_header(data64, expected_version=4, expected_flavour='64,48'):
@@ -78,13 +207,37 @@ class SpeadPacket(object):
         :return: None if no header is found, else the index and the contents 
             of the header as a tuple
         """
+        if isinstance(data64, np.ndarray):
+            return SpeadPacket.find_spead_header_np(
+                data64, expected_version, expected_flavour)
+        # the reserved field must match too, or the decode below would raise
+        expected = _magic_prefix(expected_version, expected_flavour)
         for __ctr, dataword in enumerate(data64):
-            decoded = SpeadPacket.decode_spead_magic_word(dataword)
-            if (decoded['version'] == expected_version) and (
-                        decoded['flavour'] == expected_flavour):
-                return __ctr, decoded
+            if (dataword >> 16) == expected:
+                return __ctr, SpeadPacket.decode_spead_magic_word(dataword)
         return None
 
+    @staticmethod
+    def find_spead_header_np(data64, expected_version=4,
+                             expected_flavour='64,48'):
+        """
+        Find a SPEAD header in an array of 64-bit data, using vectorised
+        numpy operations rather than decoding each word in turn.
+
+        :param data64: a numpy array (or anything np.asarray will take) of data
+        :param expected_version: the version wanted
+        :param expected_flavour: the flavour wanted
+        :return: None if no header is found, else the index and the contents
+            of the header as a tuple
+        """
+        arr = np.asarray(data64, dtype=np.uint64)
+        expected = _magic_prefix(expected_version, expected_flavour)
+        hit = np.flatnonzero((arr >> np.uint64(16)) == np.uint64(expected))
+        if hit.size == 0:
+            return None
+        idx = int(hit[0])
+        return idx, SpeadPacket.decode_spead_magic_word(int(arr[idx]))
+
     @staticmethod
     def decode_item_pointer(header64, id_bits, address_bits):
         """
@@ -95,12 +248,67 @@ class SpeadPacket(object):
         :param address_bits: how many bits are used for the data/pointer
         :return: a tuple of the ID and data/pointer
         """
-        hdr_id = header64 >> address_bits
-        # if the top bit is set, it's immediate addressing so clear the top bit
-        if hdr_id & pow(2, id_bits - 1):
-            hdr_id &= pow(2, id_bits - 1) - 1
-        hdr_data = header64 & (pow(2, address_bits) - 1)
-        return hdr_id, hdr_data
+        id_mask, addr_mask = _ptr_masks(id_bits, address_bits)
+        # the top bit of the ID flags immediate addressing, always clear it
+        return (header64 >> address_bits) & id_mask, header64 & addr_mask
+
+    @staticmethod
+    def _decode_item_pointers(words, id_bits, address_bits):
+        """
+        Decode a block of 64-bit header words in one go, see
+        decode_item_pointer.
+
+        :param words: the header words, i.e. the packet data after the
+            magic word
+        :param id_bits: how many bits are used for the ID
+        :param address_bits: how many bits are used for the data/pointer
+        :return: a tuple of a dict of the headers, keyed on ID, and the
+            packet length header (-1 if there isn't one)
+        """
+        if _spead_c is not None:
+            headers, hdr_pkt_len_bytes, dup_id = \
+                _spead_c.decode_item_pointers(
+                    np.ascontiguousarray(words, dtype=np.uint64),
+                    id_bits, address_bits)
+        else:
+            headers, hdr_pkt_len_bytes, dup_id = \
+                SpeadPacket._decode_item_pointers_py(
+                    words, id_bits, address_bits)
+        if dup_id != -1:
+            LOGGER.debug('duplicate header 0x%04x in headers: %r',
+                         dup_id, headers)
+            raise SpeadPacket.SpeadPacketError(
+                'Header ID 0x%04x already in packet headers.' % dup_id)
+        return headers, hdr_pkt_len_bytes
+
+    @staticmethod
+    def _decode_item_pointers_py(words, id_bits, address_bits):
+        """
+        Pure-Python version of _decode_item_pointers, used if the _spead_c
+        extension is not available. Packets carry only a handful of headers,
+        so a plain loop beats the fixed cost of numpy calls here.
+
+        :return: a tuple of the headers dict, the packet length header (-1
+            if there isn't one) and the first repeated non-zero header ID
+            (-1 if there isn't one)
+        """
+        id_mask, addr_mask = _ptr_masks(id_bits, address_bits)
+        if isinstance(words, np.ndarray):
+            words = words.tolist()
+        headers = {}
+        hdr_pkt_len_bytes = -1
+        for word in words:
+            # the top bit of the ID flags immediate addressing, always clear it
+            hdr_id = (word >> address_bits) & id_mask
+            # HACK - the padded headers are 0x00 - d'oh, so they may repeat.
+            # But then we MUST replace 0x0000 afterwards.
+            if (hdr_id in headers) and (hdr_id != 0x0000):
+                return headers, hdr_pkt_len_bytes, hdr_id
+            hdr_data = word & addr_mask
+            headers[hdr_id] = hdr_data
+            if hdr_id == 0x0004:
+                hdr_pkt_len_bytes = hdr_data
+        return headers, hdr_pkt_len_bytes, -1
 
     @staticmethod
     def decode_headers(data, expected_version=None,
@@ -114,27 +322,26 @@ class SpeadPacket(object):
         :param expected_hdrs: explicit number of hdrs, if required
         """
         main_header = SpeadPacket.decode_spead_magic_word(
-            data[0], required_version=expected_version,
+            int(data[0]), required_version=expected_version,
             required_flavour=expected_flavour,
             required_numheaders=expected_hdrs)
-        hdr_pkt_len_bytes = -1
-        headers = {}
-        for ctr in range(1, main_header['num_headers'] + 1):
-            hdr_id, hdr_data = SpeadPacket.decode_item_pointer(
-                data[ctr], main_header['id_bits'], main_header['address_bits'])
-            if hdr_id in headers.keys():
-                # HACK - the padded headers are 0x00 - d'oh.
-                # But then we MUST replace 0x0000 afterwards.
-                if hdr_id != 0x00:
-                    print('Current headers:', headers)
-                    print('but new header: {}'.format(hdr_id))
-                    raise SpeadPacket.SpeadPacketError(
-                        'Header ID 0x%04x already in packet headers.' % hdr_id)
-                # else:
-                #     print('UN OTRA MAS! 0x000')
-            headers[hdr_id] = hdr_data
-            if hdr_id == 0x0004:
-                hdr_pkt_len_bytes = hdr_data
+        return SpeadPacket._decode_headers(data, main_header, expected_hdrs)
+
+    @staticmethod
+    def _decode_headers(data, main_header, expected_hdrs=None):
+        """
+        Decode the SPEAD headers following an already-decoded magic word and
+        check the number of headers and the presence of the packet length
+        header.
+
+        :param data: a list of packet data, starting at the magic word
+        :param main_header: the SpeadHeader decoded from the magic word
+        :param expected_hdrs: explicit number of hdrs, if required
+        """
+        num_headers = main_header.num_headers
+        headers, hdr_pkt_len_bytes = SpeadPacket._decode_item_pointers(
+            data[1:num_headers + 1],
+            main_header.id_bits, main_header.address_bits)
         headers[0x0000] = main_header
         if expected_hdrs is not None:
             if len(headers) != expected_hdrs + 1:
@@ -147,38 +354,130 @@ class SpeadPacket(object):
                 'header! 0x0004 is missing.')
         return headers, hdr_pkt_len_bytes
 
+    @staticmethod
+    def _check_length(data, num_headers, expected_length=None):
+        """
+        Check the length of a packet's data, after the headers, against
+        that expected - this needs only the magic word to be decoded, so
+        can be done before the rest of the headers.
+        """
+        if expected_length is None:
+            return
+        pktlen = max(len(data) - num_headers - 1, 0)
+        if pktlen != expected_length:
+            raise SpeadPacket.SpeadPacketError(
+                'Packet is not the expected length, given_expected(%i bytes) '
+                'packet(%i bytes)' % (expected_length * 8, pktlen * 8))
+
     def __init__(self, headers=None, data=None):
         """
         Create a new SpeadPacket object
+
+        :param headers: a dict of the headers, keyed on ID, with the
+            SpeadHeader at 0x0000
+        :param data: the packet data, a list of 64-bit words - or a uint64
+            numpy array if from_data or from_data_fast was asked for one
+            with numpy_data=True
         """
         self.headers = headers if headers is not None else {}
         self.data = data if data is not None else []
 
+    def reset(self, headers, data):
+        """
+        Reuse this SpeadPacket for a new packet's headers and data.
+        """
+        self.headers = headers
+        self.data = data
+        try:
+            del self.ip
+        except AttributeError:
+            pass
+
     @classmethod
     def from_data(cls, data, expected_version=None, expected_flavour=None,
-                  expected_hdrs=None, expected_length=None):
+                  expected_hdrs=None, expected_length=None, packet=None,
+                  numpy_data=False):
         """
         Create a SpeadPacket from a list of 64-bit data words
         Assumes the list of data starts at the SPEAD magic word.
+        If packet is given, that SpeadPacket is reset and returned instead of
+        a new one being made. It is left untouched if decoding fails.
+        The packet data is a new list, or a new uint64 numpy array if
+        numpy_data is True.
         """
-        (headers, hdr_pkt_len_bytes) = SpeadPacket.decode_headers(
-            data, expected_version, expected_flavour, expected_hdrs)
-        main_header = headers[0x0000]
-        pktdata = []  # this is 64-bit words, which is admittedly a bit arb
-        pktlen = 0
-        for ctr in range(main_header['num_headers']+1, len(data)):
-            pktdata.append(data[ctr])
-            pktlen += 1
-        pktlen_bytes = pktlen * 8
-        if (expected_length is not None) and (pktlen != expected_length):
+        main_header = SpeadPacket.decode_spead_magic_word(
+            int(data[0]), required_version=expected_version,
+            required_flavour=expected_flavour,
+            required_numheaders=expected_hdrs)
+        num_headers = main_header.num_headers
+        SpeadPacket._check_length(data, num_headers, expected_length)
+        (headers, hdr_pkt_len_bytes) = SpeadPacket._decode_headers(
+            data, main_header, expected_hdrs)
+        return cls._from_headers(data, num_headers, headers,
+                                 hdr_pkt_len_bytes, packet, numpy_data)
+
+    @classmethod
+    def from_data_fast(cls, data, magic_prefix, main_header,
+                       expected_hdrs=None, expected_length=None, packet=None,
+                       numpy_data=False):
+        """
+        Create a SpeadPacket from a list of 64-bit data words, checking the
+        magic word against values worked out beforehand rather than decoding
+        it from scratch. See SpeadProcessor.
+
+        :param data: a list of 64-bit data words, starting at the magic word
+        :param magic_prefix: the expected magic word, less the number of
+            headers, shifted down by 16 bits
+        :param main_header: a SpeadHeader with the expected version and
+            flavour, its num_headers is replaced by that in the packet
+        :param expected_hdrs: explicit number of hdrs, if required
+        :param expected_length: explicit packet length, if required
+        :param packet: a SpeadPacket to reuse, see from_data
+        :param numpy_data: store the packet data as a numpy array, see
+            from_data
+        """
+        word64 = int(data[0])
+        if (word64 >> 16) != magic_prefix:
+            # let the full decode say what is wrong with it
+            SpeadPacket.decode_spead_magic_word(
+                word64, required_version=main_header.version,
+                required_flavour=main_header.flavour)
             raise SpeadPacket.SpeadPacketError(
-                'Packet is not the expected length, given_expected(%i bytes) '
-                'packet(%i bytes)' % (expected_length * 8, pktlen_bytes))
+                'Unexpected SPEAD magic word 0x%016x' % word64)
+        num_headers = word64 & 0xffff
+        if (expected_hdrs is not None) and (num_headers != expected_hdrs):
+            raise SpeadPacket.SpeadPacketError(
+                'Wrong num SPEAD hdrs, expected {}, got {}'.format(
+                    expected_hdrs, num_headers))
+        SpeadPacket._check_length(data, num_headers, expected_length)
+        if num_headers != main_header.num_headers:
+            main_header = main_header._replace(num_headers=num_headers)
+        (headers, hdr_pkt_len_bytes) = SpeadPacket._decode_headers(
+            data, main_header, expected_hdrs)
+        return cls._from_headers(data, num_headers, headers,
+                                 hdr_pkt_len_bytes, packet, numpy_data)
+
+    @classmethod
+    def _from_headers(cls, data, num_headers, headers, hdr_pkt_len_bytes,
+                      packet=None, numpy_data=False):
+        """
+        Create a SpeadPacket from already-decoded headers and the packet data
+        they came from.
+        """
+        # this is 64-bit words, which is admittedly a bit arb
+        # copy, so the packet never holds a view of the caller's buffer
+        if numpy_data:
+            pktdata = np.array(data[num_headers + 1:], dtype=np.uint64)
+        elif isinstance(data, np.ndarray):
+            pktdata = data[num_headers + 1:].tolist()
+        else:
+            pktdata = data[num_headers + 1:]
+        pktlen_bytes = len(pktdata) * 8
         # the data may be too long here. think 64-bit packets into 256-bit
         # interface.
         if pktlen_bytes > hdr_pkt_len_bytes:
             # too much data in heap, chop it off
-            hdr_pkt_len_64 = hdr_pkt_len_bytes / 8
+            hdr_pkt_len_64 = hdr_pkt_len_bytes // 8
             pktdata = pktdata[:hdr_pkt_len_64]
             LOGGER.warn('Packet seemed to have more data in it than the SPEAD'
                         'headers describe: pkt(%i bytes) header(%i bytes)' % (
@@ -189,6 +488,9 @@ class SpeadPacket(object):
                 'header: hdr(%i bytes) packet(%i bytes)\nCheck the magic '
                 'header, number of headers and headers 2 and 4.' % (
                     hdr_pkt_len_bytes, pktlen_bytes))
+        if packet is not None:
+            packet.reset(headers, pktdata)
+            return packet
         obj = cls(headers, pktdata)
         return obj
 
@@ -196,31 +498,48 @@ class SpeadPacket(object):
         """
         Get a list of the string representation of this packet.
         """
+        main_header = self.headers[0x0000]
+        hdr_fmt = 'header 0x%04x: 0x%x' if hex_nums else 'header 0x%04x: %i'
         rv = ['header 0x0000: version(%i) flavour(%s) num_headers(%i)' % (
-            self.headers[0]['version'], self.headers[0]['flavour'],
-            self.headers[0]['num_headers'])]
-        for hdr_id, hdr_value in self.headers.items():
-            if hdr_id == 0x0000:
-                continue
-            if hex_nums:
-                rv.append('header 0x%04x: 0x%x' % (hdr_id, hdr_value))
-            else:
-                rv.append('header 0x%04x: %i' % (hdr_id, hdr_value))
+            main_header['version'], main_header['flavour'],
+            main_header['num_headers'])]
+        rv.extend([hdr_fmt % (hdr_id, hdr_value)
+                   for hdr_id, hdr_value in self.headers.items()
+                   if hdr_id != 0x0000])
         if headers_only:
             return rv
-        for dataword in self.data:
-            if hex_nums:
-                rv.append('0x%016x' % dataword)
-            else:
-                rv.append('%i' % dataword)
+        if hex_nums:
+            rv.extend(['0x%016x' % dataword for dataword in self._words()])
+        else:
+            rv.extend(['%i' % dataword for dataword in self._words()])
         return rv
 
+    def write_to(self, stream, headers_only=False, hex_nums=False):
+        """
+        Write the string representation of this packet to a stream, one
+        line per header or data word, without building the whole list of
+        strings first.
+        """
+        stream.write('\n'.join(self.get_strings(True, hex_nums)) + '\n')
+        if headers_only:
+            return
+        data_fmt = '0x%016x\n' if hex_nums else '%i\n'
+        stream.writelines(data_fmt % dataword for dataword in self._words())
+
+    def _words(self):
+        """
+        The packet data as a list of ints, converted in one go from numpy
+        rather than boxing one numpy scalar per word.
+        """
+        if isinstance(self.data, np.ndarray):
+            return self.data.tolist()
+        return self.data
+
     def print_packet(self, headers_only=False, hex_nums=False):
         """
         Print a representation of the packet.
         """
-        for string in self.get_strings(headers_only, hex_nums):
-            print(string)
+        self.write_to(sys.stdout, headers_only, hex_nums)
 
 
 class SpeadProcessor(object):
@@ -229,7 +548,8 @@ class SpeadProcessor(object):
     to process data.
     """
     def __init__(self, version=4, flavour='64,48',
-                 packet_length=None, num_headers=None):
+                 packet_length=None, num_headers=None, ring_size=None,
+                 numpy_data=False):
         """
         Create a SpeadProcessor
         
@@ -237,12 +557,57 @@ class SpeadProcessor(object):
         :param flavour
         :param packet_length
         :param num_headers
+        :param ring_size: keep only this many of the latest packets, in a
+            deque, reusing the oldest SpeadPacket for each new one. None
+            keeps them all, in a list.
+        :param numpy_data: store each packet's data as a uint64 numpy
+            array rather than a list
         """
-        self.packets = []
+        if ring_size is None:
+            self.packets = []
+        elif ring_size < 1:
+            raise ValueError('ring_size must be at least 1, got %r' %
+                             ring_size)
+        else:
+            self.packets = deque(maxlen=ring_size)
+        self.ring_size = ring_size
+        self.numpy_data = numpy_data
         self.version = version
-        self.flavour = flavour
+        self.flavour = intern(flavour) if flavour is not None else None
         self.expected_num_headers = num_headers
         self.expected_packet_length = packet_length
+        # work out what the magic word should look like once, rather than
+        # decoding it from scratch for every packet
+        if (version is not None) and (flavour is not None):
+            total_bits, addr_bits = [int(b) for b in flavour.split(',')]
+            self._id_bits = total_bits - addr_bits
+            self._addr_bits = addr_bits
+            self._magic_prefix = _magic_prefix(version, flavour)
+            self._main_header = SpeadHeader(
+                83, version, self._id_bits, self._addr_bits, 0,
+                num_headers if num_headers is not None else 0, self.flavour)
+        else:
+            self._magic_prefix = None
+
+    def _decode_packet(self, pkt_data):
+        """
+        Decode one packet's data. If the packet ring is full, the oldest
+        SpeadPacket is reused - appending the result then moves it from the
+        front of the ring to the back.
+        """
+        recycled = None
+        if (self.ring_size is not None) and (
+                len(self.packets) == self.ring_size):
+            recycled = self.packets[0]
+        if self._magic_prefix is not None:
+            return SpeadPacket.from_data_fast(
+                pkt_data, self._magic_prefix, self._main_header,
+                self.expected_num_headers, self.expected_packet_length,
+                packet=recycled, numpy_data=self.numpy_data)
+        return SpeadPacket.from_data(
+            pkt_data, self.version, self.flavour,
+            self.expected_num_headers, self.expected_packet_length,
+            packet=recycled, numpy_data=self.numpy_data)
 
     def process_data(self, data_packets):
         """
@@ -262,13 +627,63 @@ class SpeadProcessor(object):
                     pkt_ip = None
                 if 'data' not in pkt:
                     raise RuntimeError('Could not find data key')
-            spead_pkt = SpeadPacket.from_data(
-                pkt_data, self.version, self.flavour,
-                self.expected_num_headers, self.expected_packet_length)
+            spead_pkt = self._decode_packet(pkt_data)
             if pkt_ip is not None:
                 spead_pkt.ip = pkt_ip
             self.packets.append(spead_pkt)
 
+    def process_buffer(self, words, eofs):
+        """
+        Create SpeadPacket objects from a contiguous buffer of 64-bit words,
+        e.g. straight from a snap block, split into packets by an end-of-frame
+        mask. A capture usually starts part-way through a packet, so words
+        before the first SPEAD header are ignored, as are words after the
+        last end-of-frame.
+
+        :param words: the data words, anything np.asarray can make uint64
+        :param eofs: a boolean mask the same length as words, True on the
+            last word of each packet
+        """
+        words = np.asarray(words, dtype=np.uint64)
+        eofs = np.asarray(eofs, dtype=bool)
+        if words.shape != eofs.shape:
+            raise RuntimeError('Need EOF and data lengths to be the same!')
+        if self._magic_prefix is not None:
+            found = SpeadPacket.find_spead_header_np(
+                words, self.version, self.flavour)
+            if found is None:
+                return
+            first = found[0]
+        else:
+            hits = np.flatnonzero((words >> np.uint64(56)) == np.uint64(83))
+            if hits.size == 0:
+                return
+            first = int(hits[0])
+        if first > 0:
+            LOGGER.debug('Skipping %i words before the first SPEAD header' %
+                         first)
+        ends = np.flatnonzero(eofs[first:]) + (first + 1)
+        if ends.size == 0:
+            return
+        starts = np.concatenate(([first], ends[:-1]))
+        # check all the magic words at once before decoding any packets
+        magic_words = words[starts]
+        if self._magic_prefix is not None:
+            bad = (magic_words >> np.uint64(16)) != np.uint64(
+                self._magic_prefix)
+        else:
+            bad = (magic_words >> np.uint64(56)) != np.uint64(83)
+        if bad.any():
+            first_bad = int(np.flatnonzero(bad)[0])
+            raise SpeadPacket.SpeadPacketError(
+                'Packet %i (word %i) does not start with a valid SPEAD magic '
+                'word: 0x%016x' % (first_bad, int(starts[first_bad]),
+                                   int(magic_words[first_bad])))
+        for start, end in zip(starts.tolist(), ends.tolist()):
+            pkt_data = words[start:end]
+            spead_pkt = self._decode_packet(pkt_data)
+            self.packets.append(spead_pkt)
+
 # def process_spead_word(current_spead_info, data, pkt_counter):
 #
 #     if pkt_counter == 1: